@@ -0,0 +1,294 @@
+import os
+import math
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import mediapipe as mp
+
+CameraFrame = namedtuple("CameraFrame", ["index", "image", "timestamp"])
+CameraDetection = namedtuple("CameraDetection", ["index", "image", "results", "score", "inference_ms"])
+
+
+def parse_source(source):
+    """Turns '0' / '1' into device indices; anything else is a file path."""
+    if isinstance(source, int):
+        return source
+    return int(source) if source.isdigit() else source
+
+
+class CameraSource:
+    """
+    Reads one camera or video file on a background thread.
+    Only the newest frame is kept; frames overwritten before anyone
+    took them are counted as dropped.
+    """
+    def __init__(self, source, index, width=320, height=240, fps=60, loop=False):
+        self.source = parse_source(source)
+        self.index = index
+        self.loop = loop
+        self.is_file = not isinstance(self.source, int)
+
+        self.cap = cv2.VideoCapture(self.source)
+        if not self.is_file:
+            # Optimize for low latency
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or fps
+
+        self._cond = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0
+        self._seq = 0
+        self._taken_seq = 0
+
+        # Per-camera metrics
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.latency_ms = 0.0
+
+        self.running = self.cap.isOpened()
+        if not self.running:
+            print(f"Could not open video source {source!r}")
+        self.thread = threading.Thread(target=self._run, name=f"Camera{index}", daemon=True)
+
+    def start(self):
+        if self.running:
+            self.thread.start()
+        else:
+            self.cap.release()
+
+    def request_stop(self):
+        """Ask the reader to stop without waiting; wakes anyone in wait_for_frame()."""
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+
+    def stop(self):
+        self.request_stop()
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+            if self.thread.is_alive():
+                # Still blocked in cap.read(); the reader releases the capture itself
+                print(f"Camera {self.index} did not stop in time, releasing it in the background")
+
+    def _run(self):
+        try:
+            self._read_loop()
+        finally:
+            # Released here so it never happens while cap.read() is in progress
+            self.cap.release()
+            with self._cond:
+                self.running = False
+                self._cond.notify_all()
+
+    def _read_loop(self):
+        # Video files are paced to their own frame rate so they behave like a live camera
+        interval = 1.0 / self.fps if self.is_file else 0
+        next_time = time.perf_counter()
+        frames_since_rewind = 0
+        while self.running:
+            success, frame = self.cap.read()
+            if not success:
+                if self.is_file and self.loop and frames_since_rewind:
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    frames_since_rewind = 0
+                    continue
+                if self.is_file and self.loop:
+                    print(f"Video source {self.source!r} produced no frames, stopping")
+                break
+            frames_since_rewind += 1
+            if interval:
+                next_time += interval
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            timestamp = time.perf_counter()
+            with self._cond:
+                if self._seq > self._taken_seq:
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._timestamp = timestamp
+                self._seq += 1
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+    def has_new(self):
+        return self._seq > self._taken_seq
+
+    def wait_for_frame(self, timeout, newer_than=None):
+        """
+        Wait up to `timeout` seconds for a frame that has not been taken yet
+        (and, if given, is newer than `newer_than`). Returns a CameraFrame or None.
+        """
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while True:
+                fresh = self._seq > self._taken_seq
+                if fresh and (newer_than is None or self._timestamp >= newer_than):
+                    self._taken_seq = self._seq
+                    return CameraFrame(self.index, self._frame, self._timestamp)
+                remaining = deadline - time.perf_counter()
+                if not self.running or remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def stats(self):
+        return {
+            'index': self.index,
+            'source': self.source,
+            'captured': self.frames_captured,
+            'dropped': self.frames_dropped,
+            'latency_ms': self.latency_ms,
+        }
+
+
+class MultiCapture:
+    """
+    Opens several cameras / video files and hands out time-aligned frame sets.
+    The first running source drives the pace; the others contribute their
+    frame if it was captured within `pair_tolerance` seconds of the driver's.
+    """
+    def __init__(self, sources, pair_tolerance=0.02, loop=False, **camera_kwargs):
+        self.pair_tolerance = pair_tolerance
+        self.cancelled = False
+        self.cameras = [CameraSource(src, i, loop=loop, **camera_kwargs)
+                        for i, src in enumerate(sources)]
+        for camera in self.cameras:
+            camera.start()
+
+    def isOpened(self):
+        return any(c.running or c.has_new() for c in self.cameras)
+
+    def read(self, timeout=1.0):
+        """
+        Returns a list of CameraFrame (one per camera that had a matching
+        frame), or None once every source has ended or cancel() was called.
+        """
+        while self.isOpened() and not self.cancelled:
+            driver = next((c for c in self.cameras if c.running or c.has_new()), None)
+            if driver is None:
+                break
+            frame = driver.wait_for_frame(timeout)
+            if frame is None:
+                continue
+            frames = [frame]
+            earliest = frame.timestamp - self.pair_tolerance
+            wait_until = frame.timestamp + self.pair_tolerance
+            for camera in self.cameras:
+                if camera is driver:
+                    continue
+                # Never wait past the tolerance window for a slower camera
+                remaining = max(0.0, wait_until - time.perf_counter())
+                other = camera.wait_for_frame(remaining, newer_than=earliest)
+                if other is not None:
+                    frames.append(other)
+            frames.sort(key=lambda f: f.index)
+            return frames
+        return None
+
+    def mark_processed(self, frames, done_time=None):
+        """Update each camera's capture-to-result latency (EMA)."""
+        done_time = done_time or time.perf_counter()
+        for frame in frames:
+            camera = self.cameras[frame.index]
+            latency = (done_time - frame.timestamp) * 1000
+            camera.latency_ms = latency if camera.latency_ms == 0 else camera.latency_ms * 0.9 + latency * 0.1
+
+    def stats(self):
+        return [camera.stats() for camera in self.cameras]
+
+    def cancel(self):
+        """Make a blocked read() return None right away. Safe to call from any thread."""
+        self.cancelled = True
+        for camera in self.cameras:
+            camera.request_stop()
+
+    def release(self):
+        for camera in self.cameras:
+            camera.stop()
+
+
+class MultiHandTracker:
+    """
+    One MediaPipe Hands instance per camera (they are not safe to share),
+    run in parallel on a thread pool when there are cores to spare.
+    MediaPipe releases the GIL inside its graph, so threads overlap well.
+    """
+    def __init__(self, camera_count, **hands_kwargs):
+        self._hands = [mp.solutions.hands.Hands(**hands_kwargs) for _ in range(camera_count)]
+        workers = min(camera_count, os.cpu_count() or 1)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Inference") if workers > 1 else None
+
+    def _process_one(self, frame):
+        # Mirror for a natural selfie view, MediaPipe wants RGB
+        image = cv2.flip(frame.image, 1)
+        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        start = time.perf_counter()
+        results = self._hands[frame.index].process(image_rgb)
+        inference_ms = (time.perf_counter() - start) * 1000
+
+        score = 0.0
+        if results.multi_hand_landmarks:
+            score = landmark_score(results.multi_hand_landmarks[0])
+        return CameraDetection(frame.index, image, results, score, inference_ms)
+
+    def process(self, frames):
+        """Run hand detection on every frame. Returns CameraDetection list in the same order."""
+        if self._executor and len(frames) > 1:
+            return list(self._executor.map(self._process_one, frames))
+        return [self._process_one(frame) for frame in frames]
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+        for hands in self._hands:
+            hands.close()
+
+
+def landmark_score(hand_landmarks, edge=0.02, full_size=0.15):
+    """
+    How well one camera sees the hand, 0-1.
+    The Hands solution only reports a handedness score (left vs right), which
+    sits near 1.0 for any detection, so quality is judged from the landmarks:
+    the fraction inside the image (a clipped hand gives bad finger distances)
+    times the apparent palm size (more pixels = steadier landmarks).
+    """
+    points = hand_landmarks.landmark
+    inside = sum(1 for lm in points if edge <= lm.x <= 1 - edge and edge <= lm.y <= 1 - edge)
+    wrist, middle_mcp = points[0], points[9]
+    palm = math.hypot(middle_mcp.x - wrist.x, middle_mcp.y - wrist.y)
+    return inside / len(points) * min(1.0, palm / full_size)
+
+
+class CameraSelector:
+    """
+    Picks the hand that drives the cursor from per-camera detections.
+
+    Only the best camera's landmarks are used: each camera has its own image
+    frame, so averaging normalized coordinates across cameras gives a hand
+    that is in neither view. The selected camera is kept until another one
+    scores `switch_margin` better (or loses the hand), so the cursor does
+    not jump between views every frame.
+    """
+    def __init__(self, switch_margin=0.1):
+        self.switch_margin = switch_margin
+        self.selected = None
+
+    def select(self, detections):
+        """Returns (hand_landmarks, selected_detection) or (None, None) when no camera saw a hand."""
+        found = [d for d in detections if d.results.multi_hand_landmarks]
+        if not found:
+            self.selected = None
+            return None, None
+
+        best = max(found, key=lambda d: d.score)
+        current = next((d for d in found if d.index == self.selected), None)
+        if current is None or best.score > current.score + self.switch_margin:
+            current = best
+        self.selected = current.index
+        return current.results.multi_hand_landmarks[0], current
@@ -0,0 +1,94 @@
+import math
+import mediapipe as mp
+
+from gestures.names import GESTURE_NAMES
+
+mp_hands = mp.solutions.hands
+
+# Default thresholds (match the settings window defaults)
+DEFAULT_PINCH_THRESHOLD = 0.05
+DEFAULT_THUMBS_OFFSET = 0.05
+
+
+def get_distance(lm1, lm2):
+    return math.hypot(lm1.x - lm2.x, lm1.y - lm2.y)
+
+def get_hand_label(index, hand, results):
+    label = None
+    if results.multi_handedness:
+        classification = results.multi_handedness[index]
+        if classification.classification:
+            label = classification.classification[0].label
+    return label
+
+def get_finger_states(hand_landmarks):
+    if hand_landmarks is None: return None
+    fingers = []
+    lms = hand_landmarks.landmark
+    wrist_lm = lms[mp_hands.HandLandmark.WRIST]
+    tip_ids = [
+        mp_hands.HandLandmark.THUMB_TIP, mp_hands.HandLandmark.INDEX_FINGER_TIP,
+        mp_hands.HandLandmark.MIDDLE_FINGER_TIP, mp_hands.HandLandmark.RING_FINGER_TIP,
+        mp_hands.HandLandmark.PINKY_TIP
+    ]
+    pip_ids = [
+        mp_hands.HandLandmark.THUMB_IP, mp_hands.HandLandmark.INDEX_FINGER_PIP,
+        mp_hands.HandLandmark.MIDDLE_FINGER_PIP, mp_hands.HandLandmark.RING_FINGER_PIP,
+        mp_hands.HandLandmark.PINKY_PIP
+    ]
+    tip_dist = get_distance(lms[tip_ids[0]], wrist_lm)
+    pip_dist = get_distance(lms[pip_ids[0]], wrist_lm)
+    fingers.append(1 if tip_dist > pip_dist else 0)
+    for i in range(1, 5):
+        tip_dist = get_distance(lms[tip_ids[i]], wrist_lm)
+        pip_dist = get_distance(lms[pip_ids[i]], wrist_lm)
+        fingers.append(1 if tip_dist > pip_dist else 0)
+    return fingers
+
+def is_thumbs_up(hand_landmarks, fingers_list, offset=DEFAULT_THUMBS_OFFSET):
+    if fingers_list != [1, 0, 0, 0, 0]: return False
+    lms = hand_landmarks.landmark
+    return lms[4].y < lms[2].y - offset
+
+def is_thumbs_down(hand_landmarks, fingers_list, offset=DEFAULT_THUMBS_OFFSET):
+    if fingers_list != [1, 0, 0, 0, 0]: return False
+    lms = hand_landmarks.landmark
+    return lms[4].y > lms[2].y + offset
+
+def is_pinch(hand_landmarks, threshold=DEFAULT_PINCH_THRESHOLD):
+    lms = hand_landmarks.landmark
+    thumb_tip = lms[mp_hands.HandLandmark.THUMB_TIP]
+    index_tip = lms[mp_hands.HandLandmark.INDEX_FINGER_TIP]
+    distance = get_distance(thumb_tip, index_tip)
+    return distance < threshold
+
+def is_pinch_mid(hand_landmarks, threshold=DEFAULT_PINCH_THRESHOLD):
+    lms = hand_landmarks.landmark
+    thumb_tip = lms[mp_hands.HandLandmark.THUMB_TIP]
+    index_tip = lms[mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
+    distance = get_distance(thumb_tip, index_tip)
+    return distance < threshold
+
+def classify_gesture(hand_landmarks, fingers_list=None,
+                     pinch_threshold=DEFAULT_PINCH_THRESHOLD, thumbs_offset=DEFAULT_THUMBS_OFFSET):
+    """
+    Returns the name of the gesture shown by one hand, or "None".
+    This is the single classifier used by both the live loop and evaluate.py.
+    """
+    if hand_landmarks is None:
+        return "None"
+    if fingers_list is None:
+        fingers_list = get_finger_states(hand_landmarks)
+    if is_pinch(hand_landmarks, pinch_threshold):
+        return "PINCH"
+    elif is_pinch_mid(hand_landmarks, pinch_threshold):
+        return "PINCH_MID"
+    elif is_thumbs_up(hand_landmarks, fingers_list, thumbs_offset):
+        return "THUMBS_UP"
+    elif is_thumbs_down(hand_landmarks, fingers_list, thumbs_offset):
+        return "THUMBS_DOWN"
+    elif fingers_list == [1, 1, 1, 1, 1]:
+        return "OPEN"
+    elif fingers_list == [1, 1, 0, 0, 1]:
+        return "TOGGLE"
+    return "None"
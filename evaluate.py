@@ -0,0 +1,318 @@
+"""
+Offline gesture accuracy / throughput evaluation.
+
+Dataset layout (any mix of the two):
+    dataset/
+        PINCH/clip1.mp4          every frame labelled with the folder name
+        OPEN/clip2.mp4           (clip2.labels.txt, one label per line, overrides it)
+                                 labels must match the gesture names exactly
+        traces/session.npz       landmarks (N, 21, 3) with NaN rows for "no hand",
+                                 labels (N,) and optional fps
+
+Usage:
+    python evaluate.py dataset
+    python evaluate.py dataset --grid pinch_threshold=0.03,0.04,0.05,0.06 --grid thumbs_offset=0.03,0.05
+
+Check the label handling:
+    python -m doctest evaluate.py
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import itertools
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from classifier import (GESTURE_NAMES, DEFAULT_PINCH_THRESHOLD, DEFAULT_THUMBS_OFFSET,
+                        classify_gesture)
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+TRACE_EXTENSIONS = (".npz",)
+TUNABLE_PARAMS = {
+    'pinch_threshold': DEFAULT_PINCH_THRESHOLD,
+    'thumbs_offset': DEFAULT_THUMBS_OFFSET,
+}
+
+Point = namedtuple("Point", ["x", "y", "z"])
+
+
+class TraceHand:
+    """Minimal stand-in for MediaPipe's landmark list: exposes `.landmark[i].x/.y/.z`."""
+    __slots__ = ("landmark",)
+
+    def __init__(self, points):
+        self.landmark = [Point(*p) for p in points]
+
+
+# --- Loading ---
+def find_samples(dataset_dir):
+    """Returns every clip / trace file under the dataset directory."""
+    samples = []
+    for root, _, files in os.walk(dataset_dir):
+        for name in sorted(files):
+            if name.lower().endswith(VIDEO_EXTENSIONS + TRACE_EXTENSIONS):
+                samples.append(os.path.join(root, name))
+    return sorted(samples)
+
+def load_trace(path):
+    data = np.load(path, allow_pickle=False)
+    landmarks = np.asarray(data['landmarks'], dtype=np.float32)
+    labels = [str(label) for label in data['labels']]
+    fps = float(data['fps']) if 'fps' in data else 30.0
+    return landmarks, labels, fps
+
+def extract_clip(path):
+    """Runs MediaPipe over a clip exactly like the live loop and returns landmarks + labels."""
+    import cv2
+    import mediapipe as mp
+
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    hands = mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=1,
+        model_complexity=0,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5
+    )
+    frames = []
+    while True:
+        success, image = cap.read()
+        if not success:
+            break
+        image = cv2.flip(image, 1)
+        results = hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        if results.multi_hand_landmarks:
+            lms = results.multi_hand_landmarks[0].landmark
+            frames.append([(lm.x, lm.y, lm.z) for lm in lms])
+        else:
+            frames.append(np.full((21, 3), np.nan))
+    cap.release()
+    hands.close()
+    landmarks = np.asarray(frames, dtype=np.float32).reshape(-1, 21, 3)
+
+    labels = frame_labels(path, len(landmarks), read_label_file(path))
+    return landmarks, labels, fps
+
+def read_label_file(path):
+    """Lines of clip.labels.txt (blank = "None"), or None when the clip has no label file."""
+    label_file = os.path.splitext(path)[0] + ".labels.txt"
+    if not os.path.exists(label_file):
+        return None
+    with open(label_file, encoding="utf-8") as f:
+        return [line.strip() or "None" for line in f]
+
+def frame_labels(path, frame_count, lines=None):
+    """
+    One label per frame: the label file's lines (padded with "None" or cut
+    to the clip length), or else the folder name repeated for every frame.
+
+    >>> frame_labels(os.path.join("dataset", "PINCH", "clip.mp4"), 3)
+    ['PINCH', 'PINCH', 'PINCH']
+    >>> frame_labels(os.path.join("dataset", "PINCH", "clip.mp4"), 4, ["OPEN", "None", "PINCH"])
+    ['OPEN', 'None', 'PINCH', 'None']
+    >>> frame_labels(os.path.join("dataset", "PINCH", "clip.mp4"), 2, ["OPEN", "None", "PINCH"])
+    ['OPEN', 'None']
+    """
+    if lines is None:
+        return [os.path.basename(os.path.dirname(path))] * frame_count
+    return (lines + ["None"] * frame_count)[:frame_count]
+
+def unknown_labels(path):
+    """Labels in a sample that are not gesture names (typos, wrong case...)."""
+    if path.lower().endswith(TRACE_EXTENSIONS):
+        with np.load(path, allow_pickle=False) as data:
+            labels = {str(label) for label in data['labels']}
+    else:
+        lines = read_label_file(path)
+        labels = set(lines) if lines is not None else set(frame_labels(path, 1))
+    return sorted(labels - set(GESTURE_NAMES))
+
+def load_sample(path):
+    if path.lower().endswith(TRACE_EXTENSIONS):
+        return load_trace(path)
+    return extract_clip(path)
+
+
+# --- Worker ---
+def evaluate_sample(path, param_sets):
+    """
+    Classify every frame of one sample under each parameter set.
+    Runs in a worker process; returns plain data so it pickles cheaply.
+    """
+    landmarks, labels, fps = load_sample(path)
+    index = {name: i for i, name in enumerate(GESTURE_NAMES)}
+    size = len(GESTURE_NAMES)
+
+    # Build hands once, reuse for every parameter set
+    hands = [None if np.isnan(frame).any() else TraceHand(frame.tolist()) for frame in landmarks]
+    unknown = sorted(set(labels) - set(index))
+    if unknown:
+        raise ValueError(f"{path}: unknown label(s) {', '.join(unknown)}")
+    truth = [index[label] for label in labels]
+
+    results = []
+    for params in param_sets:
+        confusion = np.zeros((size, size), dtype=np.int64)
+        false_triggers = 0
+        previous = 0
+        start = time.perf_counter()
+        for hand, expected in zip(hands, truth):
+            predicted = index[classify_gesture(hand, **params)] if hand is not None else 0
+            confusion[expected, predicted] += 1
+            # A false trigger is the onset of a gesture that is not the labelled one
+            if predicted != previous and predicted != 0 and predicted != expected:
+                false_triggers += 1
+            previous = predicted
+        elapsed = time.perf_counter() - start
+        results.append({
+            'confusion': confusion.tolist(),
+            'false_triggers': false_triggers,
+            'classify_seconds': elapsed,
+        })
+    return {'path': path, 'frames': len(hands), 'fps': fps, 'results': results}
+
+
+# --- Reporting ---
+def parse_grid(grid_args):
+    """Turns ['pinch_threshold=0.04,0.05'] into a list of parameter dicts."""
+    values = {name: [default] for name, default in TUNABLE_PARAMS.items()}
+    for arg in grid_args or []:
+        name, _, raw = arg.partition("=")
+        if name not in TUNABLE_PARAMS or not raw:
+            raise SystemExit(f"Bad --grid '{arg}'. Tunable: {', '.join(TUNABLE_PARAMS)}")
+        values[name] = [float(v) for v in raw.split(",")]
+    names = list(values)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(values[n] for n in names))]
+
+def summarize(confusion, false_triggers, minutes):
+    confusion = np.asarray(confusion)
+    total = confusion.sum()
+    accuracy = np.trace(confusion) / total if total else 0.0
+    per_gesture = {}
+    for i, name in enumerate(GESTURE_NAMES):
+        labelled = confusion[i].sum()
+        predicted = confusion[:, i].sum()
+        per_gesture[name] = {
+            'recall': confusion[i, i] / labelled if labelled else None,
+            'precision': confusion[i, i] / predicted if predicted else None,
+            'frames': int(labelled),
+        }
+    return {
+        'accuracy': float(accuracy),
+        'false_triggers_per_min': false_triggers / minutes if minutes else 0.0,
+        'per_gesture': per_gesture,
+    }
+
+def print_confusion(confusion):
+    width = max(len(n) for n in GESTURE_NAMES) + 1
+    print(" " * width + "".join(f"{n[:width]:>{width}}" for n in GESTURE_NAMES))
+    for name, row in zip(GESTURE_NAMES, confusion):
+        print(f"{name:<{width}}" + "".join(f"{int(v):>{width}}" for v in row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline gesture accuracy / throughput evaluation")
+    parser.add_argument("dataset", help="Directory of labelled clips and/or landmark traces")
+    parser.add_argument("--grid", action="append", metavar="PARAM=V1,V2",
+                        help="Parameter values to sweep (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: all cores)")
+    parser.add_argument("--json", metavar="FILE", help="Also write the full report as JSON")
+    args = parser.parse_args()
+
+    samples = find_samples(args.dataset)
+    if not samples:
+        print(f"No clips or traces found in {args.dataset}")
+        return 1
+    param_sets = parse_grid(args.grid)
+
+    # Unknown labels would silently be scored as "None", so refuse to start
+    bad = [(path, unknown_labels(path)) for path in samples]
+    bad = [(path, labels) for path, labels in bad if labels]
+    if bad:
+        for path, labels in bad:
+            print(f"{path}: unknown label(s) {', '.join(repr(l) for l in labels)}")
+        print(f"Labels must be one of: {', '.join(GESTURE_NAMES)}")
+        return 1
+
+    # Traces are cheap to reload, so big sweeps are split across workers too.
+    # Clips keep the whole grid in one task to avoid re-running MediaPipe.
+    workers = max(1, args.workers or 1)
+    chunks = max(1, min(len(param_sets), -(-workers // len(samples))))
+    tasks = []
+    for path in samples:
+        if path.lower().endswith(TRACE_EXTENSIONS) and chunks > 1:
+            for i in range(chunks):
+                offset = i * len(param_sets) // chunks
+                end = (i + 1) * len(param_sets) // chunks
+                tasks.append((path, offset, param_sets[offset:end]))
+        else:
+            tasks.append((path, 0, param_sets))
+
+    size = len(GESTURE_NAMES)
+    confusions = [np.zeros((size, size), dtype=np.int64) for _ in param_sets]
+    false_triggers = [0] * len(param_sets)
+    minutes = [0.0] * len(param_sets)
+    classify_seconds = 0.0
+    frames_evaluated = 0
+
+    print(f"Evaluating {len(samples)} samples x {len(param_sets)} parameter sets on {workers} workers...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(evaluate_sample, path, chunk): offset for path, offset, chunk in tasks}
+        for future in as_completed(futures):
+            offset = futures[future]
+            report = future.result()
+            for i, result in enumerate(report['results'], start=offset):
+                confusions[i] += np.asarray(result['confusion'])
+                false_triggers[i] += result['false_triggers']
+                minutes[i] += report['frames'] / report['fps'] / 60
+                classify_seconds += result['classify_seconds']
+                frames_evaluated += report['frames']
+    wall = time.perf_counter() - start
+
+    summaries = [summarize(c, f, m) for c, f, m in zip(confusions, false_triggers, minutes)]
+    ranking = sorted(range(len(param_sets)),
+                     key=lambda i: (-summaries[i]['accuracy'], summaries[i]['false_triggers_per_min']))
+
+    print(f"\n{'accuracy':>9} {'false/min':>10}  parameters")
+    for i in ranking:
+        params = ", ".join(f"{k}={v:g}" for k, v in param_sets[i].items())
+        print(f"{summaries[i]['accuracy']:>9.1%} {summaries[i]['false_triggers_per_min']:>10.2f}  {params}")
+
+    best = ranking[0]
+    print("\nConfusion matrix (rows = label, columns = prediction) for the best set:")
+    print_confusion(confusions[best])
+    print("\nPer gesture:")
+    for name, stats in summaries[best]['per_gesture'].items():
+        if stats['frames']:
+            precision = f"{stats['precision']:.1%}" if stats['precision'] is not None else "-"
+            print(f"  {name:<12} recall {stats['recall']:.1%}  precision {precision}  ({stats['frames']} frames)")
+
+    print(f"\nThroughput: {frames_evaluated / wall:,.0f} frames/s overall, "
+          f"{frames_evaluated / classify_seconds if classify_seconds else 0:,.0f} frames/s per worker "
+          f"(classifier only), {wall:.1f}s wall")
+
+    if args.json:
+        report = {
+            'samples': samples,
+            'wall_seconds': wall,
+            'frames_evaluated': frames_evaluated,
+            'results': [
+                {'params': param_sets[i], 'confusion': confusions[i].tolist(), **summaries[i]}
+                for i in range(len(param_sets))
+            ],
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+# gestures/names.py
+# Kept free of imports so log readers and tools can use it without MediaPipe.
+
+# Gesture names, in the order classify_gesture checks them
+GESTURE_NAMES = ["None", "PINCH", "PINCH_MID", "THUMBS_UP", "THUMBS_DOWN", "OPEN", "TOGGLE"]
@@ -0,0 +1,85 @@
+import queue
+import time
+from collections import deque
+
+
+class PerfMetrics:
+    """
+    Thread-safe bridge between the vision loop and the settings window.
+    The loop only does a non-blocking put per frame; all aggregation
+    happens on the consumer side when snapshot() is called.
+    """
+    def __init__(self, history=60, max_pending=256):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._last_capture = None
+        self._last_dropped_total = None
+
+        # Rolling history for sparklines (one point per snapshot)
+        self.fps_history = deque(maxlen=history)
+        self.inference_history = deque(maxlen=history)
+        self.latency_history = deque(maxlen=history)
+        self.dropped_history = deque(maxlen=history)
+        self.dropped_total = 0
+
+    def record(self, capture_time, inference_ms, latency_ms, dropped_total=0):
+        """
+        Called once per frame from the vision loop. Never blocks: if the UI
+        is not draining, the sample is simply discarded.
+        `dropped_total` is the running count of frames the capture side
+        actually lost (camera overwrites + queue drops). It is cumulative,
+        so discarded samples never hide or invent drops.
+        """
+        try:
+            self._queue.put_nowait((capture_time, inference_ms, latency_ms, dropped_total))
+        except queue.Full:
+            pass
+
+    def snapshot(self):
+        """
+        Drain pending samples and fold them into the history.
+        Returns the latest values, or None if no frames arrived.
+        """
+        samples = []
+        while True:
+            try:
+                samples.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not samples:
+            return None
+
+        captures = [s[0] for s in samples]
+        if self._last_capture is not None:
+            captures.insert(0, self._last_capture)
+        self._last_capture = samples[-1][0]
+
+        # Measured drops since the previous snapshot
+        latest_dropped = max(s[3] for s in samples)
+        if self._last_dropped_total is None:
+            self._last_dropped_total = min(s[3] for s in samples)
+        dropped = max(0, latest_dropped - self._last_dropped_total)
+        self._last_dropped_total = latest_dropped
+
+        span = captures[-1] - captures[0]
+        fps = (len(captures) - 1) / span if span > 0 else 0.0
+        inference_ms = sum(s[1] for s in samples) / len(samples)
+        latency_ms = sum(s[2] for s in samples) / len(samples)
+
+        self.dropped_total += dropped
+        self.fps_history.append(fps)
+        self.inference_history.append(inference_ms)
+        self.latency_history.append(latency_ms)
+        self.dropped_history.append(dropped)
+
+        return {
+            'fps': fps,
+            'inference_ms': inference_ms,
+            'latency_ms': latency_ms,
+            'dropped': dropped,
+            'dropped_total': self.dropped_total,
+        }
+
+    @staticmethod
+    def now():
+        """Clock used for all frame timestamps."""
+        return time.perf_counter()
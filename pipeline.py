@@ -0,0 +1,228 @@
+import time
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Queue policies: what happens when a stage produces faster than the next consumes
+DROP_OLDEST = "drop_oldest"   # discard the oldest waiting item (freshest data wins)
+BLOCK = "block"               # wait for space (nothing is ever lost)
+COALESCE = "coalesce"         # merge the new item into the waiting one
+
+# Returned by a stage's process() to end the pipeline (e.g. camera closed)
+END = object()
+
+
+class ChannelClosed(Exception):
+    pass
+
+
+class Channel:
+    """Bounded asyncio queue between two stages with an explicit overflow policy."""
+    def __init__(self, maxsize=1, policy=DROP_OLDEST, merge=None):
+        if policy not in (DROP_OLDEST, BLOCK, COALESCE):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        # Default coalescing keeps the newest item
+        self.merge = merge or (lambda old, new: new)
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self._items = deque()
+        self._cond = asyncio.Condition()
+
+    async def put(self, item):
+        async with self._cond:
+            if len(self._items) >= self.maxsize and not self.closed:
+                if self.policy == BLOCK:
+                    await self._cond.wait_for(lambda: len(self._items) < self.maxsize or self.closed)
+                elif self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                else:
+                    item = self.merge(self._items.pop(), item)
+                    self.coalesced += 1
+            if self.closed:
+                raise ChannelClosed()
+            self._items.append(item)
+            self._cond.notify_all()
+
+    async def get(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._items or self.closed)
+            if not self._items:
+                raise ChannelClosed()
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    async def close(self):
+        async with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class Stage:
+    """
+    One step of the pipeline. Subclasses implement process(item) and return
+    the item for the next stage, None to drop it, or END to stop the pipeline.
+    The first stage is a source: process() is called with None in a loop.
+
+    Set `executor` to a name to run process() on a dedicated worker thread
+    (for blocking calls); stages sharing a name share the thread. Leave it
+    None to run on the event loop thread (needed for OpenCV windows).
+    """
+    name = "stage"
+    executor = None
+
+    def __init__(self):
+        self.processed = 0
+        self.busy_ms = 0.0
+
+    def process(self, item):
+        raise NotImplementedError
+
+    def cancel(self):
+        """
+        Unblock a process() call that may be waiting (e.g. on a camera).
+        Called on the event loop thread as soon as the pipeline stops, before
+        in-flight calls are waited for, so it must not block.
+        """
+        pass
+
+    def close(self):
+        """Release resources. Called once after the pipeline has stopped."""
+        pass
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'processed': self.processed,
+            'avg_ms': self.busy_ms / self.processed if self.processed else 0.0,
+        }
+
+
+class Pipeline:
+    """
+    Runs stages concurrently on an asyncio loop, connected by bounded channels,
+    so capture, inference and output of consecutive frames overlap.
+    stop() may be called from any thread (settings window, signal handler).
+    """
+    def __init__(self):
+        self.stages = []
+        self.channels = []    # channels[i] feeds stages[i + 1]
+        self._links = []
+        self._executors = {}
+        self._loop = None
+        self._stop_event = None
+        self._stop_requested = False
+
+    def add(self, stage, queue_size=1, policy=DROP_OLDEST, merge=None):
+        """Append a stage; the queue settings describe the link from the previous stage."""
+        if self.stages:
+            self._links.append((queue_size, policy, merge))
+        self.stages.append(stage)
+        return stage
+
+    def stop(self):
+        """Request a clean shutdown. Thread safe."""
+        self._stop_requested = True
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                # Loop already shut down
+                pass
+
+    @property
+    def running(self):
+        return self._loop is not None and not self._stop_requested
+
+    def run(self):
+        """Blocking entry point: run until a stage ends or stop() is called."""
+        asyncio.run(self._run())
+
+    def _executor(self, name):
+        if name is None:
+            return None
+        if name not in self._executors:
+            # One thread per executor name keeps each stage's calls in order
+            self._executors[name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        return self._executors[name]
+
+    async def _run(self):
+        self._stop_event = asyncio.Event()
+        self.channels = [Channel(size, policy, merge) for size, policy, merge in self._links]
+        self._loop = asyncio.get_running_loop()
+        if self._stop_requested:
+            self._stop_event.set()
+
+        tasks = [asyncio.create_task(self._drive(i, stage), name=stage.name)
+                 for i, stage in enumerate(self.stages)]
+        stopper = asyncio.create_task(self._stop_event.wait())
+        try:
+            await asyncio.wait(tasks + [stopper], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self._stop_requested = True
+            for channel in self.channels:
+                await channel.close()
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            stopper.cancel()
+            for stage in self.stages:
+                try:
+                    stage.cancel()
+                except Exception as e:
+                    print(f"Error cancelling stage {stage.name}: {e}")
+            # Let in-flight blocking calls finish before resources are released
+            for executor in self._executors.values():
+                executor.shutdown(wait=True)
+            self._executors.clear()
+            for stage in self.stages:
+                try:
+                    stage.close()
+                except Exception as e:
+                    print(f"Error closing stage {stage.name}: {e}")
+            self._loop = None
+
+        errors = [r for r in results
+                  if isinstance(r, Exception) and not isinstance(r, (asyncio.CancelledError, ChannelClosed))]
+        if errors:
+            raise errors[0]
+
+    async def _drive(self, index, stage):
+        loop = asyncio.get_running_loop()
+        inbox = self.channels[index - 1] if index > 0 else None
+        outbox = self.channels[index] if index < len(self.channels) else None
+        executor = self._executor(stage.executor)
+
+        while True:
+            item = await inbox.get() if inbox else None
+            start = time.perf_counter()
+            if executor:
+                result = await loop.run_in_executor(executor, stage.process, item)
+            else:
+                result = stage.process(item)
+            stage.busy_ms += (time.perf_counter() - start) * 1000
+            stage.processed += 1
+
+            if result is END:
+                return
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+            if not executor:
+                # Inline stages must yield so other stages get scheduled
+                await asyncio.sleep(0)
+
+    def stats(self):
+        """Per-stage throughput, time spent and inbox losses."""
+        stats = []
+        for i, stage in enumerate(self.stages):
+            entry = stage.stats()
+            if i > 0 and self.channels:
+                channel = self.channels[i - 1]
+                entry.update(policy=channel.policy, dropped=channel.dropped, coalesced=channel.coalesced)
+            stats.append(entry)
+        return stats
@@ -0,0 +1,207 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+
+# Leaf frames of a thread that is blocked waiting, not working
+IDLE_FUNCTIONS = {
+    "threading.Condition.wait",
+    "threading.Event.wait",
+    "threading.Thread.join",
+    "threading.Thread._wait_for_tstate_lock",
+    "queue.Queue.get",
+    "thread._worker",                 # executor worker waiting for a job
+    "tkinter.Misc.mainloop",
+    "windows_events.IocpProactor._poll",
+}
+
+
+def is_idle(leaf):
+    return leaf in IDLE_FUNCTIONS or leaf.endswith(".select")
+
+
+class SamplingProfiler:
+    """
+    Low-overhead sampling profiler for the vision loop.
+    A background thread periodically snapshots the stacks of the threads
+    whose names start with one of `thread_prefixes` (or only `target_thread`,
+    or every thread when both are None) and counts identical stacks, so the
+    loop runs untouched. Stacks of threads that are blocked waiting are left
+    out; each stack is rooted at its thread name, so pipeline stages running
+    on worker threads show up as separate towers in the flamegraph.
+    """
+    def __init__(self, target_thread=None, sample_rate=200, output_dir="profiles", thread_prefixes=None):
+        self.target_thread = target_thread
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.thread_prefixes = tuple(thread_prefixes) if thread_prefixes else None
+
+        self.thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._stacks = Counter()
+        self._sample_count = 0
+        self._started_at = 0
+        # Sampler-thread caches: code object -> name, code tuple -> stack string
+        self._code_names = {}
+        self._stack_strings = {}
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """Start sampling in a background thread."""
+        if self.running:
+            return
+        with self._lock:
+            self._stacks.clear()
+            self._sample_count = 0
+        self._code_names.clear()
+        self._stack_strings.clear()
+        self._stop_event.clear()
+        self._started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self.thread.start()
+        print(f"Profiler started ({self.sample_rate} Hz)")
+
+    def stop(self):
+        """Stop sampling, write the collapsed stacks and print a summary."""
+        if not self.running:
+            return None
+        self._stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+        path = self.write_collapsed()
+        elapsed = time.perf_counter() - self._started_at
+        print(f"Profiler stopped: {self._sample_count} samples in {elapsed:.1f}s -> {path}")
+        top = self.top_functions()
+        for thread, busy in self.thread_busy().items():
+            print(f"  {thread}: busy {busy:.1%}")
+            for _, name, inclusive, own in [entry for entry in top if entry[0] == thread]:
+                print(f"    {inclusive:6.1%} total  {own:6.1%} self  {name}")
+        return path
+
+    def toggle(self):
+        """Start if stopped, stop if running. Returns the new running state."""
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+        return self.running
+
+    def _run(self):
+        own_id = threading.get_ident()
+        target_id = self.target_thread.ident if self.target_thread else None
+        interval = 1.0 / max(1, self.sample_rate)
+        next_sample = time.perf_counter()
+        while not self._stop_event.is_set():
+            frames = sys._current_frames()
+            if target_id is not None:
+                if target_id not in frames:
+                    # Target thread has exited, nothing left to sample
+                    break
+                frames = {target_id: frames[target_id]}
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stacks = []
+            for ident, frame in frames.items():
+                name = names.get(ident, str(ident))
+                if ident == own_id or (self.thread_prefixes and not name.startswith(self.thread_prefixes)):
+                    continue
+                if is_idle(self._frame_name(frame.f_code)):
+                    continue
+                stacks.append(self._collapse(name, frame))
+            del frames
+            with self._lock:
+                for stack in stacks:
+                    self._stacks[stack] += 1
+                self._sample_count += 1
+
+            # Sleep until the next tick, skipping ticks we already missed
+            next_sample += interval
+            delay = next_sample - time.perf_counter()
+            if delay < 0:
+                next_sample = time.perf_counter()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    def _frame_name(self, code):
+        name = self._code_names.get(code)
+        if name is None:
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            name = self._code_names[code] = f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+        return name
+
+    def _collapse(self, thread_name, frame):
+        """
+        Turn a frame into a root-first 'thread;a;b;c' stack string.
+        The loop sees the same few stacks over and over, so only the frame
+        walk is done per sample; names and strings are built once.
+        """
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        key = (thread_name, tuple(codes))
+        stack = self._stack_strings.get(key)
+        if stack is None:
+            names = [self._frame_name(code) for code in reversed(codes)]
+            stack = self._stack_strings[key] = ";".join([thread_name] + names)
+        return stack
+
+    def write_collapsed(self, path=None):
+        """
+        Write stacks in the collapsed format used by flamegraph.pl and
+        speedscope: one 'frame;frame;frame count' line per unique stack.
+        """
+        if path is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(self.output_dir, f"profile-{stamp}.folded")
+        with self._lock:
+            stacks = self._stacks.most_common()
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks:
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def top_functions(self, limit=5):
+        """
+        Return (thread, name, inclusive_fraction, self_fraction) for the
+        hottest functions of each thread, sorted by inclusive time. Fractions
+        are of sampling ticks for that thread, so they never exceed 100%.
+        """
+        inclusive = Counter()
+        own = Counter()
+        with self._lock:
+            total = self._sample_count
+            stacks = list(self._stacks.items())
+        if not total:
+            return []
+        for stack, count in stacks:
+            thread, *names = stack.split(";")
+            # Count recursive frames only once per sample
+            for name in set(names):
+                inclusive[thread, name] += count
+            own[thread, names[-1]] += count
+        top = []
+        for thread in sorted({thread for thread, _ in inclusive}):
+            ranked = sorted(((key, count) for key, count in inclusive.items() if key[0] == thread),
+                            key=lambda item: item[1], reverse=True)
+            top.extend((thread, name, count / total, own[thread, name] / total)
+                       for (_, name), count in ranked[:limit])
+        return sorted(top, key=lambda entry: entry[2], reverse=True)
+
+    def thread_busy(self):
+        """Fraction of sampling ticks each thread spent working (not waiting), busiest first."""
+        busy = Counter()
+        with self._lock:
+            total = self._sample_count
+            for stack, count in self._stacks.items():
+                busy[stack.split(";", 1)[0]] += count
+        if not total:
+            return {}
+        return {thread: count / total for thread, count in busy.most_common()}
@@ -0,0 +1,158 @@
+class P2Quantile:
+    """
+    Streaming quantile estimate using the P² algorithm (Jain & Chlamtac, 1985).
+    Keeps five markers regardless of how many samples are added, so memory
+    and per-sample cost are constant and no history is stored.
+    """
+    def __init__(self, p):
+        self.p = p
+        self.count = 0
+        self.q = []                                  # marker heights
+        self.n = [0, 1, 2, 3, 4]                     # actual marker positions
+        self.np = [0, 2 * p, 4 * p, 2 + 2 * p, 4]    # desired marker positions
+        self.dn = [0, p / 2, p, (1 + p) / 2, 1]      # desired position increments
+
+    def add(self, x):
+        self.count += 1
+        q, n = self.q, self.n
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        # Find the cell containing x, stretching the extremes if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.np[i] += self.dn[i]
+
+        # Nudge the middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = self.np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = self._linear(i, d)
+                q[i] = height
+                n[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.q, self.n
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def _linear(self, i, d):
+        q, n = self.q, self.n
+        return q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+
+    def value(self):
+        """Current estimate, or None before the first sample."""
+        if not self.q:
+            return None
+        if self.count < 5:
+            return self.q[int(round(self.p * (len(self.q) - 1)))]
+        return self.q[2]
+
+
+class RoiCalibrator:
+    """
+    Learns the cursor ROI from where the wrist actually goes.
+    Low/high quantiles of the wrist position (plus a margin) give the
+    proposed box; adapt() walks the live ROI towards it at a capped rate
+    so the cursor mapping never jumps.
+    """
+    # Same limits as the ROI sliders in the settings window
+    MIN_LIMITS = (0.0, 0.8)
+    MAX_LIMITS = (0.2, 1.0)
+
+    # Live ROI edges further than this from our last output mean someone else
+    # (a slider, "Apply Suggested") moved them
+    EDIT_TOLERANCE = 1e-4
+
+    # Longest gap between adapt() calls that still counts as elapsed time,
+    # so the ROI does not jump when the hand comes back after leaving the frame
+    MAX_STEP_SECONDS = 0.1
+
+    def __init__(self, low=0.05, high=0.95, margin=0.03, max_rate=0.05, min_span=0.2, warmup=90):
+        self.low = low
+        self.high = high
+        self.margin = margin
+        self.max_rate = max_rate      # max edge movement, normalized units per second
+        self.min_span = min_span
+        self.warmup = warmup          # samples before a proposal is made
+        self.roi = None
+        self._last_adapt = None
+        self.reset()
+
+    def reset(self, roi=None):
+        """Forget all samples; optionally start adapting from `roi`."""
+        self._x = (P2Quantile(self.low), P2Quantile(self.high))
+        self._y = (P2Quantile(self.low), P2Quantile(self.high))
+        self.count = 0
+        self.roi = tuple(roi) if roi else None
+        self._last_adapt = None
+
+    def observe(self, x, y):
+        """Feed one wrist position (normalized 0-1). O(1)."""
+        self._x[0].add(x)
+        self._x[1].add(x)
+        self._y[0].add(y)
+        self._y[1].add(y)
+        self.count += 1
+
+    def start_adapting(self, roi):
+        """Begin adapting from `roi`, keeping the samples learned so far."""
+        self.roi = tuple(roi)
+        self._last_adapt = None
+
+    @property
+    def ready(self):
+        return self.count >= self.warmup
+
+    def _axis(self, low_est, high_est):
+        lo = max(self.MIN_LIMITS[0], min(self.MIN_LIMITS[1], low_est.value() - self.margin))
+        hi = max(self.MAX_LIMITS[0], min(self.MAX_LIMITS[1], high_est.value() + self.margin))
+        if hi - lo < self.min_span:
+            # Too narrow to map to a whole screen; widen around the centre
+            centre = (lo + hi) / 2
+            lo = max(self.MIN_LIMITS[0], min(self.MIN_LIMITS[1], centre - self.min_span / 2))
+            hi = max(self.MAX_LIMITS[0], min(self.MAX_LIMITS[1], lo + self.min_span))
+        return lo, hi
+
+    def proposal(self):
+        """Suggested (x_min, x_max, y_min, y_max), or None while warming up."""
+        if not self.ready:
+            return None
+        return self._axis(*self._x) + self._axis(*self._y)
+
+    def adapt(self, current_roi, now):
+        """
+        Move the ROI one rate-limited step towards the proposal.
+        If `current_roi` was changed since the last call, adaptation restarts
+        from it instead of overwriting the edit.
+        Returns the new (x_min, x_max, y_min, y_max).
+        """
+        if self.roi is None or any(abs(live - ours) > self.EDIT_TOLERANCE
+                                   for live, ours in zip(current_roi, self.roi)):
+            self.start_adapting(current_roi)
+        target = self.proposal()
+        if target is None or self._last_adapt is None:
+            self._last_adapt = now
+            return self.roi
+        max_step = self.max_rate * min(now - self._last_adapt, self.MAX_STEP_SECONDS)
+        self._last_adapt = now
+        self.roi = tuple(edge + max(-max_step, min(max_step, goal - edge))
+                         for edge, goal in zip(self.roi, target))
+        return self.roi
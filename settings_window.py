@@ -14,6 +14,7 @@ class ModernSlider(ttk.Frame):
         self.resolution = resolution
         self.callback = callback
         self.unit = unit
+        self._silent = False
         
         # Container frame
         container = ttk.Frame(self)
@@ -68,6 +69,8 @@ class ModernSlider(ttk.Frame):
     
     def _on_change(self, val):
         """Handle slider change."""
+        if self._silent:
+            return
         float_val = float(val)
         rounded_val = round(float_val / self.resolution) * self.resolution
         self.value_var.set(self._format_value(rounded_val))
@@ -88,13 +91,29 @@ class ModernSlider(ttk.Frame):
         """Set slider value."""
         self.slider.set(value)
         self._on_change(value)
+    
+    def show(self, value):
+        """Move the slider to display value without rounding or firing the callback."""
+        self._silent = True
+        try:
+            self.slider.set(value)
+        finally:
+            self._silent = False
+        self.value_var.set(self._format_value(value))
 
 
 class SettingsWindow:
-    def __init__(self, on_quit=None):
+    # How often the performance card redraws (ms)
+    PERF_REFRESH_MS = 250
+    # How often auto-calibrated ROI values are pushed to the sliders (ms)
+    ROI_REFRESH_MS = 250
+
+    def __init__(self, on_quit=None, on_profile_toggle=None, metrics=None):
         self.window = None
         self.thread = None
         self.on_quit_callback = on_quit 
+        self.on_profile_toggle_callback = on_profile_toggle
+        self.metrics = metrics
         
         # Default settings
         self.smoothing_factor = 0.5
@@ -108,6 +127,11 @@ class SettingsWindow:
         self.roi_y_min = 0.5
         self.roi_y_max = 0.9
         self.scroll_speed = 3
+        self.profiler_sample_rate = 200
+        
+        # --- NEW: ROI auto-calibration (fed by the vision loop) ---
+        self.roi_auto_calibrate = False
+        self.roi_suggestion = None
         
         # --- NEW: Lock state for camera window ---
         self.camera_window_locked = True
@@ -183,6 +207,11 @@ class SettingsWindow:
         subtitle = ttk.Label(title_frame, text="Adjust parameters in real-time", font=('Segoe UI', 9), foreground='#7f8c8d')
         subtitle.pack()
 
+        # --- NEW: Live performance card ---
+        if self.metrics:
+            self._create_perf_card(main_frame)
+        # --- END NEW ---
+
         # ... (All Slider/Card code for Thresholds is unchanged) ...
         cursor_card = self._create_card(main_frame, "🖱️ Cursor Settings")
         self.smoothing_slider = ModernSlider(cursor_card, "Smoothing Factor", self.smoothing_factor, 0.0, 1.0, 0.05, lambda v: setattr(self, 'smoothing_factor', v), "Higher = more responsive • Lower = smoother")
@@ -194,14 +223,26 @@ class SettingsWindow:
             ttk.Button(preset_frame, text=name, command=lambda v=value: self.smoothing_slider.set(v), width=10).pack(side=tk.LEFT, padx=2)
         ttk.Separator(cursor_card, orient='horizontal').pack(fill=tk.X, pady=10)
         ttk.Label(cursor_card, text="Tracking Area (ROI)", font=('Segoe UI', 9, 'bold')).pack(anchor=tk.W, padx=5)
-        self.roi_x_min_slider = ModernSlider(cursor_card, "ROI Left Edge", self.roi_x_min, 0.0, 0.8, 0.05, lambda v: setattr(self, 'roi_x_min', v), "Left boundary of hand tracking area")
+        self.roi_x_min_slider = ModernSlider(cursor_card, "ROI Left Edge", self.roi_x_min, 0.0, 0.8, 0.05, lambda v: self._set_roi_edge('roi_x_min', v), "Left boundary of hand tracking area")
         self.roi_x_min_slider.pack(fill=tk.X)
-        self.roi_x_max_slider = ModernSlider(cursor_card, "ROI Right Edge", self.roi_x_max, 0.2, 1.0, 0.05, lambda v: setattr(self, 'roi_x_max', v), "Right boundary of hand tracking area")
+        self.roi_x_max_slider = ModernSlider(cursor_card, "ROI Right Edge", self.roi_x_max, 0.2, 1.0, 0.05, lambda v: self._set_roi_edge('roi_x_max', v), "Right boundary of hand tracking area")
         self.roi_x_max_slider.pack(fill=tk.X)
-        self.roi_y_min_slider = ModernSlider(cursor_card, "ROI Top Edge", self.roi_y_min, 0.0, 0.8, 0.05, lambda v: setattr(self, 'roi_y_min', v), "Top boundary of hand tracking area")
+        self.roi_y_min_slider = ModernSlider(cursor_card, "ROI Top Edge", self.roi_y_min, 0.0, 0.8, 0.05, lambda v: self._set_roi_edge('roi_y_min', v), "Top boundary of hand tracking area")
         self.roi_y_min_slider.pack(fill=tk.X)
-        self.roi_y_max_slider = ModernSlider(cursor_card, "ROI Bottom Edge", self.roi_y_max, 0.2, 1.0, 0.05, lambda v: setattr(self, 'roi_y_max', v), "Bottom boundary of hand tracking area")
+        self.roi_y_max_slider = ModernSlider(cursor_card, "ROI Bottom Edge", self.roi_y_max, 0.2, 1.0, 0.05, lambda v: self._set_roi_edge('roi_y_max', v), "Bottom boundary of hand tracking area")
         self.roi_y_max_slider.pack(fill=tk.X)
+        
+        # --- NEW: ROI auto-calibration ---
+        calib_frame = ttk.Frame(cursor_card)
+        calib_frame.pack(fill=tk.X, pady=(5, 0), padx=5)
+        self.roi_auto_btn = ttk.Button(calib_frame, command=self._toggle_roi_auto_calibrate, width=22)
+        self.roi_auto_btn.pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(calib_frame, text="Apply Suggested", command=self._apply_roi_suggestion).pack(side=tk.LEFT)
+        self.roi_suggestion_var = tk.StringVar(value="Suggested ROI: move your hand around to learn it")
+        ttk.Label(cursor_card, textvariable=self.roi_suggestion_var, font=('Segoe UI', 8), foreground='#666666').pack(anchor=tk.W, padx=5, pady=(5, 0))
+        self._update_roi_auto_button()
+        self.window.after(self.ROI_REFRESH_MS, self._refresh_roi_calibration)
+        # --- END NEW ---
         gesture_card = self._create_card(main_frame, "👆 Gesture Thresholds")
         self.pinch_slider = ModernSlider(gesture_card, "Pinch Threshold", self.pinch_threshold, 0.01, 0.15, 0.01, lambda v: setattr(self, 'pinch_threshold', v), "Distance between fingers to trigger pinch")
         self.pinch_slider.pack(fill=tk.X)
@@ -237,6 +278,17 @@ class SettingsWindow:
         self.tracking_conf_slider = ModernSlider(detection_card, "Tracking Confidence", self.min_tracking_confidence, 0.3, 1.0, 0.05, lambda v: setattr(self, 'min_tracking_confidence', v), "Minimum confidence to track hand continuously")
         self.tracking_conf_slider.pack(fill=tk.X)
         
+        # --- NEW: Diagnostics card (sampling profiler) ---
+        if self.on_profile_toggle_callback:
+            diagnostics_card = self._create_card(main_frame, "🩺 Diagnostics")
+            self.profiler_rate_slider = ModernSlider(diagnostics_card, "Profiler Sample Rate", self.profiler_sample_rate, 50, 500, 50, lambda v: setattr(self, 'profiler_sample_rate', int(v)), "Stack samples per second while profiling", unit="Hz")
+            self.profiler_rate_slider.pack(fill=tk.X)
+            self.profile_toggle_btn = ttk.Button(diagnostics_card, text="▶ Start Profiling",
+                                                 command=self._toggle_profiler)
+            self.profile_toggle_btn.pack(anchor=tk.W, padx=5, pady=(5, 0))
+            ttk.Label(diagnostics_card, text="Writes a flamegraph-ready .folded file to the profiles folder", font=('Segoe UI', 8), foreground='#666666').pack(anchor=tk.W, padx=5, pady=(5, 0))
+        # --- END NEW ---
+        
         # === BUTTONS ===
         button_card = ttk.Frame(main_frame)
         button_card.pack(fill=tk.X, pady=(15, 10))
@@ -281,6 +333,127 @@ class SettingsWindow:
             self.lock_toggle_btn.configure(text="🔒 Lock Window", style="Lock.TButton")
     # --- END NEW ---
     
+    # --- NEW: Live performance card ---
+    def _create_perf_card(self, parent):
+        """Builds the FPS / inference / latency / dropped frames readouts."""
+        perf_card = self._create_card(parent, "📈 Performance")
+        self.perf_rows = {}
+        rows = [
+            ('fps', "FPS", "#27ae60"),
+            ('inference_ms', "Inference", "#2980b9"),
+            ('latency_ms', "Latency", "#8e44ad"),
+            ('dropped', "Dropped", "#e74c3c"),
+        ]
+        for key, label, color in rows:
+            frame = ttk.Frame(perf_card, style='Card.TFrame')
+            frame.pack(fill=tk.X, padx=5, pady=2)
+            tk.Label(frame, text=label, width=10, anchor="w", font=('Segoe UI', 10), background='white').pack(side=tk.LEFT)
+            value_var = tk.StringVar(value="--")
+            tk.Label(frame, textvariable=value_var, width=12, anchor="e", font=('Segoe UI', 10, 'bold'), foreground=color, background='white').pack(side=tk.LEFT)
+            spark = tk.Canvas(frame, width=240, height=28, background='white', highlightthickness=0)
+            spark.pack(side=tk.RIGHT, padx=(10, 0))
+            self.perf_rows[key] = (value_var, spark, color)
+        self.window.after(self.PERF_REFRESH_MS, self._refresh_perf_card)
+
+    def _refresh_perf_card(self):
+        """Drains the metrics queue and redraws the card at a fixed low rate."""
+        try:
+            snapshot = self.metrics.snapshot()
+            if snapshot:
+                self.perf_rows['fps'][0].set(f"{snapshot['fps']:.1f}")
+                self.perf_rows['inference_ms'][0].set(f"{snapshot['inference_ms']:.1f} ms")
+                self.perf_rows['latency_ms'][0].set(f"{snapshot['latency_ms']:.1f} ms")
+                self.perf_rows['dropped'][0].set(f"{snapshot['dropped']} ({snapshot['dropped_total']})")
+                self._draw_sparkline('fps', self.metrics.fps_history)
+                self._draw_sparkline('inference_ms', self.metrics.inference_history)
+                self._draw_sparkline('latency_ms', self.metrics.latency_history)
+                self._draw_sparkline('dropped', self.metrics.dropped_history)
+            self.window.after(self.PERF_REFRESH_MS, self._refresh_perf_card)
+        except tk.TclError:
+            # Window is being destroyed
+            pass
+
+    def _draw_sparkline(self, key, values):
+        """Draws a tiny line chart of the history on the row's canvas."""
+        _, spark, color = self.perf_rows[key]
+        spark.delete("all")
+        if len(values) < 2:
+            return
+        width = int(spark['width'])
+        height = int(spark['height'])
+        top = max(values) or 1
+        step = width / (values.maxlen - 1)
+        offset = width - step * (len(values) - 1)
+        points = []
+        for i, v in enumerate(values):
+            points.append(offset + i * step)
+            points.append(height - 2 - (v / top) * (height - 4))
+        spark.create_line(*points, fill=color, width=1.5)
+    # --- END NEW ---
+    
+    # --- NEW: ROI auto-calibration ---
+    def _toggle_roi_auto_calibrate(self):
+        """Turns continuous ROI adaptation on or off."""
+        self.roi_auto_calibrate = not self.roi_auto_calibrate
+        self._update_roi_auto_button()
+
+    def _update_roi_auto_button(self):
+        text = "🎯 Auto-Calibrate: On" if self.roi_auto_calibrate else "🎯 Auto-Calibrate: Off"
+        style = "Lock.TButton" if self.roi_auto_calibrate else "Unlock.TButton"
+        self.roi_auto_btn.configure(text=text, style=style)
+
+    def _apply_roi_suggestion(self):
+        """One-shot: adopt the current suggestion and keep it (auto mode is turned off)."""
+        if self.roi_suggestion:
+            self._stop_roi_auto_calibrate()
+            self.roi_x_min, self.roi_x_max, self.roi_y_min, self.roi_y_max = self.roi_suggestion
+            self._show_roi()
+
+    def _set_roi_edge(self, name, value):
+        """ROI slider callback: a manual edit wins over auto-calibration."""
+        self._stop_roi_auto_calibrate()
+        setattr(self, name, value)
+
+    def _stop_roi_auto_calibrate(self):
+        if self.roi_auto_calibrate:
+            self.roi_auto_calibrate = False
+            self._update_roi_auto_button()
+            print("ROI edited manually, auto-calibration turned off")
+
+    def _show_roi(self):
+        """Moves the ROI sliders to the current (possibly unrounded) ROI values."""
+        self.roi_x_min_slider.show(self.roi_x_min)
+        self.roi_x_max_slider.show(self.roi_x_max)
+        self.roi_y_min_slider.show(self.roi_y_min)
+        self.roi_y_max_slider.show(self.roi_y_max)
+
+    def _refresh_roi_calibration(self):
+        """Publishes the suggestion and, in auto mode, the live ROI to the sliders."""
+        try:
+            suggestion = self.roi_suggestion
+            if suggestion:
+                self.roi_suggestion_var.set("Suggested ROI: x {:.2f}-{:.2f}, y {:.2f}-{:.2f}".format(*suggestion))
+            if self.roi_auto_calibrate:
+                self._show_roi()
+            self.window.after(self.ROI_REFRESH_MS, self._refresh_roi_calibration)
+        except tk.TclError:
+            # Window is being destroyed
+            pass
+    # --- END NEW ---
+    
+    def _toggle_profiler(self):
+        """Starts or stops the sampling profiler and updates the button."""
+        profiling = self.on_profile_toggle_callback()
+        self.set_profiling_state(profiling)
+    
+    def set_profiling_state(self, profiling):
+        """Updates the profiler button text to match the profiler state."""
+        text = "⏹ Stop Profiling" if profiling else "▶ Start Profiling"
+        try:
+            self.profile_toggle_btn.configure(text=text)
+        except (AttributeError, tk.TclError):
+            pass
+    
     def _quit_app(self):
         """Signals the main thread to stop and closes the UI."""
         if self.on_quit_callback:
@@ -316,6 +489,7 @@ class SettingsWindow:
         
         # --- NEW: Reset lock state ---
         self.camera_window_locked = True
+        self.roi_auto_calibrate = False
         
         try:
             # ... (Resetting sliders) ...
@@ -341,6 +515,7 @@ class SettingsWindow:
             
             # --- NEW: Update lock button ---
             self._update_lock_button_style()
+            self._update_roi_auto_button()
                 
         except:
             pass
@@ -356,6 +531,7 @@ class SettingsWindow:
             'pinch_threshold': self.pinch_threshold,
             # ... (all other settings) ...
             'scroll_speed': self.scroll_speed,
+            'roi_auto_calibrate': self.roi_auto_calibrate,
             
             # --- NEW: Also return lock state ---
             'camera_window_locked': self.camera_window_locked,
@@ -0,0 +1,365 @@
+import time
+import cv2
+import mediapipe as mp
+import pyautogui
+
+# --- pywin32 for window control ---
+try:
+    import win32con
+    import win32gui
+except ImportError:
+    win32gui = None
+
+from classifier import get_finger_states, classify_gesture
+from capture import CameraSelector
+from pipeline import Stage, END
+
+mp_hands = mp.solutions.hands
+mp_drawing = mp.solutions.drawing_utils
+
+
+class FrameContext:
+    """Everything known about one frame set as it moves through the stages."""
+    def __init__(self, frames, capture_time):
+        self.frames = frames
+        self.capture_time = capture_time
+        self.time = None
+        self.image = None
+        self.hand_landmarks = None
+        self.best_detection = None
+        self.inference_ms = 0.0
+        self.gesture = "None"
+        self.action = "None"
+        self.mappings = None
+        self.program_active = True
+
+
+class CaptureStage(Stage):
+    """Source: waits for the next paired frame set from the cameras."""
+    name = "capture"
+    executor = "capture"
+
+    def __init__(self, cap):
+        super().__init__()
+        self.cap = cap
+
+    def process(self, _):
+        frames = self.cap.read()
+        if frames is None:
+            return END
+        # Frames are paired to the first camera's capture time
+        return FrameContext(frames, frames[0].timestamp)
+
+    def cancel(self):
+        # A stalled or unplugged camera must not keep read() (and shutdown) waiting
+        self.cap.cancel()
+
+    def close(self):
+        self.cap.release()
+
+
+class InferenceStage(Stage):
+    """Runs MediaPipe on every camera and picks the camera that sees the hand best (the main bottleneck)."""
+    name = "inference"
+    executor = "inference"
+
+    def __init__(self, cap, tracker, selector=None):
+        super().__init__()
+        self.cap = cap
+        self.tracker = tracker
+        self.selector = selector or CameraSelector()
+
+    def process(self, ctx):
+        start = time.perf_counter()
+        detections = self.tracker.process(ctx.frames)
+        ctx.inference_ms = (time.perf_counter() - start) * 1000
+        self.cap.mark_processed(ctx.frames)
+
+        # Use the camera that sees the hand best; preview that camera
+        ctx.hand_landmarks, ctx.best_detection = self.selector.select(detections)
+        ctx.image = (ctx.best_detection or detections[0]).image
+        return ctx
+
+    def close(self):
+        self.tracker.close()
+
+
+class ClassifyStage(Stage):
+    """Detects the gesture, looks up its action and feeds ROI calibration."""
+    name = "classify"
+
+    def __init__(self, settings, roi_calibrator):
+        super().__init__()
+        self.settings = settings
+        self.roi_calibrator = roi_calibrator
+        self.roi_adapting = False
+        self.mappings = None
+
+    def process(self, ctx):
+        settings = self.settings
+        ctx.time = time.time()
+        hand_landmarks = ctx.hand_landmarks
+        if hand_landmarks is not None:
+            fingers_list = get_finger_states(hand_landmarks)
+            self._calibrate_roi(hand_landmarks.landmark[0], ctx.time)
+
+            # 1. --- DETECT GESTURE ---
+            ctx.gesture = classify_gesture(hand_landmarks, fingers_list,
+                                           pinch_threshold=settings.pinch_threshold)
+
+            # 2. --- LOOKUP ACTION ---
+            # Tk variables are only read while a hand is visible
+            self.mappings = {}
+            if settings.action_mappings:
+                for action, var in settings.action_mappings.items():
+                    self.mappings[action] = var.get()
+            for action_name, gesture_name in self.mappings.items():
+                if gesture_name == ctx.gesture:
+                    ctx.action = action_name
+                    break
+        ctx.mappings = self.mappings
+        return ctx
+
+    def _calibrate_roi(self, wrist, now):
+        """Learn the ROI from where the wrist goes (O(1) per frame)."""
+        settings = self.settings
+        self.roi_calibrator.observe(wrist.x, wrist.y)
+        settings.roi_suggestion = self.roi_calibrator.proposal()
+        if settings.roi_auto_calibrate:
+            current_roi = (settings.roi_x_min, settings.roi_x_max, settings.roi_y_min, settings.roi_y_max)
+            if not self.roi_adapting:
+                # Start from whatever the sliders are set to now
+                self.roi_calibrator.start_adapting(current_roi)
+                self.roi_adapting = True
+            (settings.roi_x_min, settings.roi_x_max,
+             settings.roi_y_min, settings.roi_y_max) = self.roi_calibrator.adapt(current_roi, now)
+        else:
+            self.roi_adapting = False
+
+
+class DispatchStage(Stage):
+    """
+    Handles pause/resume and performs mouse actions. Runs on its own thread
+    so slow pyautogui calls never stall capture or preview; all gesture
+    timing state lives here.
+    """
+    name = "dispatch"
+    executor = "dispatch"
+    SCROLL_EVERY_N_FRAMES = 2
+
+    def __init__(self, settings, actions, metrics, telemetry, frames_dropped):
+        super().__init__()
+        self.settings = settings
+        self.actions = actions
+        self.metrics = metrics
+        self.telemetry = telemetry
+        self.frames_dropped = frames_dropped    # callable: measured frames lost so far
+
+        # --- Gesture State Tracking ---
+        self.program_active = True
+        self.pointer_was_up = False
+        self.pinch_active = False
+        self.pinch_start_time = None
+        self.pinch_is_held = False
+        self.last_fist_action_time = 0
+        self.scroll_frame_counter = 0
+
+    def process(self, ctx):
+        gesture = ctx.gesture
+        if ctx.hand_landmarks is not None:
+            # 3. --- HANDLE TOGGLE (ALWAYS) ---
+            if gesture == "TOGGLE":
+                if not self.pointer_was_up:
+                    self.program_active = not self.program_active
+                    self.telemetry.toggle(self.program_active)
+                    self.pointer_was_up = True
+            else:
+                self.pointer_was_up = False
+
+            # 4. --- EXECUTE ACTIONS (if active) ---
+            if self.program_active and gesture != "TOGGLE":
+                self._execute(ctx.action, ctx.hand_landmarks, ctx.time)
+
+        self.telemetry.gesture(gesture, ctx.action)
+        self._release_click(ctx)
+        self.scroll_frame_counter += 1
+        ctx.program_active = self.program_active
+
+        # Latency = capture until the action for this frame has been performed
+        latency_ms = (time.perf_counter() - ctx.capture_time) * 1000
+        dropped_total = self.frames_dropped()
+        self.metrics.record(ctx.capture_time, ctx.inference_ms, latency_ms, dropped_total)
+        self.telemetry.frame(latency_ms, ctx.inference_ms, ctx.hand_landmarks is not None,
+                             self.program_active, dropped_total)
+        return ctx
+
+    def _execute(self, action, hand_landmarks, current_time):
+        action_function = self.actions.get(action)
+        if not action_function:
+            return
+        if action == "Move Cursor":
+            action_function(hand_landmarks)
+
+        elif action == "Left Click (Hold)":
+            # NEW PINCH TIMING LOGIC
+            if not self.pinch_active:
+                # First frame of pinch detected
+                self.pinch_start_time = current_time
+                self.pinch_active = True
+                self.pinch_is_held = False
+            else:
+                # Pinch is being held
+                pinch_duration = current_time - self.pinch_start_time
+
+                # If held for more than pinch_duration setting and not yet transitioned to hold
+                if pinch_duration >= self.settings.pinch_duration and not self.pinch_is_held:
+                    action_function()  # Press and hold
+                    self.pinch_is_held = True
+
+            # Always move cursor while pinching
+            move_action_func = self.actions.get("Move Cursor")
+            if move_action_func:
+                move_action_func(hand_landmarks)
+
+        elif action == "Right Click (Once)":
+            if current_time - self.last_fist_action_time > self.settings.fist_cooldown:
+                action_function()
+                self.last_fist_action_time = current_time
+
+        elif action in ["Scroll Up", "Scroll Down"]:
+            if self.scroll_frame_counter % self.SCROLL_EVERY_N_FRAMES == 0:
+                action_function()
+
+    def _release_click(self, ctx):
+        """Click / release once the pinch gesture ends."""
+        if ctx.mappings is None:
+            return
+        click_hold_gesture = ctx.mappings.get("Left Click (Hold)", "None")
+        if ctx.gesture != click_hold_gesture and self.pinch_active:
+            # Pinch gesture ended
+            pinch_duration = ctx.time - self.pinch_start_time if self.pinch_start_time else 0
+
+            # Quick pinch (less than pinch_duration setting) - perform single click
+            if pinch_duration < self.settings.pinch_duration:
+                pyautogui.click()  # Single click action
+            elif self.pinch_is_held:
+                # Long pinch was held - release the held button
+                self.actions["Left Click (Release)"]()
+
+            # Reset pinch state
+            self.pinch_active = False
+            self.pinch_start_time = None
+            self.pinch_is_held = False
+
+    def close(self):
+        # Never leave the left button stuck down on exit
+        if self.pinch_is_held:
+            self.actions["Left Click (Release)"]()
+
+
+class PreviewStage(Stage):
+    """Draws the overlay and shows the camera window. Must run on the thread that created it."""
+    name = "preview"
+
+    def __init__(self, cap, window_name, on_close, debug=True):
+        super().__init__()
+        self.cap = cap
+        self.window_name = window_name
+        self.on_close = on_close
+        self.debug = debug
+
+        cv2.namedWindow(window_name)
+        cv2.setWindowProperty(window_name, cv2.WND_PROP_TOPMOST, 1)
+        # Position camera window on the left side to avoid overlap with settings
+        cv2.moveWindow(window_name, 20, 20)
+
+    def process(self, ctx):
+        image = ctx.image
+        # Only draw landmarks if debug mode is on (saves processing time)
+        if self.debug and ctx.hand_landmarks is not None:
+            mp_drawing.draw_landmarks(image, ctx.hand_landmarks, mp_hands.HAND_CONNECTIONS)
+            cv2.putText(image, f"Gesture: {ctx.gesture}", (10, 50),
+                        cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 2)
+
+        state_text = "ACTIVE" if ctx.program_active else "PAUSED"
+        state_color = (0, 255, 0) if ctx.program_active else (0, 0, 255)
+        cv2.putText(image, f"Program: {state_text}", (10, 30),
+                    cv2.FONT_HERSHEY_PLAIN, 2, state_color, 3)
+
+        # Per-camera latency / drops
+        if self.debug and len(self.cap.cameras) > 1:
+            best = ctx.best_detection
+            for i, cam in enumerate(self.cap.stats()):
+                marker = "*" if best and best.index == cam['index'] else " "
+                cv2.putText(image, f"{marker}cam{cam['index']}: {cam['latency_ms']:.0f}ms drop {cam['dropped']}",
+                            (10, image.shape[0] - 10 - 15 * i), cv2.FONT_HERSHEY_PLAIN, 1, (255, 255, 0), 1)
+
+        cv2.imshow(self.window_name, image)
+
+        # Ensure window stays on top every frame
+        try:
+            cv2.setWindowProperty(self.window_name, cv2.WND_PROP_TOPMOST, 1)
+        except cv2.error:
+            pass
+
+        # 1ms is the minimum, any lower and OpenCV won't process events
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            self.on_close()
+        try:
+            if cv2.getWindowProperty(self.window_name, cv2.WND_PROP_VISIBLE) < 1:
+                self.on_close()
+        except cv2.error:
+            self.on_close()
+        return ctx
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class WindowStage(Stage):
+    """Applies the lock / unlock (click-through) style to the camera window."""
+    name = "window"
+
+    def __init__(self, settings, window_name):
+        super().__init__()
+        self.settings = settings
+        self.window_name = window_name
+        self.last_lock_state = None
+        if win32gui is None:
+            print("pywin32 not found. Window style cannot be changed.")
+            print("Run: pip install pywin32")
+
+    def process(self, ctx):
+        # Check if the state has changed
+        current_lock_state = self.settings.camera_window_locked
+        if win32gui is None or current_lock_state == self.last_lock_state:
+            return None
+        try:
+            hwnd = win32gui.FindWindow(None, self.window_name)
+            if hwnd:
+                style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
+                ex_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+
+                if current_lock_state:
+                    # LOCK THE WINDOW
+                    # Add click-through and remove title bar
+                    style = style & ~win32con.WS_CAPTION & ~win32con.WS_SYSMENU
+                    ex_style = ex_style | win32con.WS_EX_TRANSPARENT | win32con.WS_EX_LAYERED
+                else:
+                    # UNLOCK THE WINDOW
+                    # Add title bar and remove click-through
+                    style = style | win32con.WS_CAPTION | win32con.WS_SYSMENU
+                    ex_style = ex_style & ~win32con.WS_EX_TRANSPARENT & ~win32con.WS_EX_LAYERED
+                win32gui.SetWindowLong(hwnd, win32con.GWL_STYLE, style)
+                win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, ex_style)
+
+                # Force window to update its frame
+                win32gui.SetWindowPos(hwnd, win32con.HWND_TOPMOST, 0, 0, 0, 0,
+                                      win32con.SWP_NOMOVE | win32con.SWP_NOSIZE | win32con.SWP_NOZORDER | win32con.SWP_FRAMECHANGED)
+                print(f"Window locked: {current_lock_state}")
+
+            self.last_lock_state = current_lock_state
+        except Exception as e:
+            print(f"Error setting window style: {e}")
+        return None
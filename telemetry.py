@@ -0,0 +1,367 @@
+"""
+Session telemetry: a compact, append-only binary log of how the tool behaves.
+
+Every record is the same 28 bytes (RECORD_DTYPE), so files can be memory-mapped
+straight into NumPy structured arrays. The vision loop only appends tuples to a
+bounded queue; a background thread batches them to disk and rotates files by size.
+
+Summarize the logs:
+    python telemetry.py telemetry/
+"""
+import os
+import sys
+import time
+import glob
+import queue
+import argparse
+import threading
+
+import numpy as np
+
+from gestures.names import GESTURE_NAMES
+
+MAGIC = b"AGTELEM1"
+HEADER_SIZE = 16   # magic (8) + record size (4) + reserved (4)
+
+RECORD_DTYPE = np.dtype([
+    ('time', '<f8'),          # unix timestamp
+    ('event', 'u1'),
+    ('gesture', 'u1'),        # GESTURE_NAMES index (SETTING: SETTING_NAMES index)
+    ('action', 'u1'),         # ACTION_NAMES index
+    ('flags', 'u1'),          # FLAG_* bits
+    ('fps', '<f4'),
+    ('latency_ms', '<f4'),
+    ('inference_ms', '<f4'),
+    ('value', '<f4'),         # event specific, see below
+])
+
+# Event types
+EVENT_STATS = 0            # once per second; value = dropped frames in that second
+EVENT_GESTURE = 1          # a new gesture was recognised
+EVENT_ACTION = 2           # a new action started
+EVENT_TOGGLE = 3           # program paused / resumed (see FLAG_ACTIVE)
+EVENT_TRACKING_LOST = 4
+EVENT_TRACKING_FOUND = 5   # value = seconds the hand was lost
+EVENT_SETTING = 6          # gesture = SETTING_NAMES index, value = new value
+EVENT_SESSION_START = 7
+EVENT_SESSION_END = 8
+
+FLAG_ACTIVE = 1
+FLAG_HAND = 2
+
+ACTION_NAMES = ["None", "Move Cursor", "Left Click (Hold)", "Right Click (Once)", "Scroll Up", "Scroll Down"]
+SETTING_NAMES = ["smoothing_factor", "fist_cooldown", "pinch_threshold", "pinch_duration",
+                 "min_detection_confidence", "min_tracking_confidence",
+                 "roi_x_min", "roi_x_max", "roi_y_min", "roi_y_max", "scroll_speed"]
+UNKNOWN = 255
+
+
+class TelemetryWriter:
+    """
+    Background writer for telemetry records.
+    All public methods are called from the vision loop and never block:
+    per-frame numbers are aggregated in memory and only one STATS record
+    per second (plus state-change events) is queued for the writer thread.
+    """
+    def __init__(self, directory="telemetry", settings=None, max_file_bytes=8 * 1024 * 1024,
+                 stats_interval=1.0, max_pending=4096):
+        self.directory = directory
+        self.settings = settings
+        self.max_file_bytes = max_file_bytes
+        self.stats_interval = stats_interval
+        self.records_dropped = 0
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self.thread = None
+        self._file = None
+        self._file_bytes = 0
+        self._file_index = 0
+
+        # Loop-side state (only touched by the vision loop thread)
+        self._gesture_index = {name: i for i, name in enumerate(GESTURE_NAMES)}
+        self._action_index = {name: i for i, name in enumerate(ACTION_NAMES)}
+        self._last_gesture = "None"
+        self._last_action = "None"
+        self._hand_present = False
+        self._lost_at = None
+        self._flags = FLAG_ACTIVE
+        self._interval_start = None
+        self._frames = 0
+        self._latency_sum = 0.0
+        self._inference_sum = 0.0
+        self._last_dropped_total = 0
+        self._last_settings = {}
+
+    # --- Loop-side API ---
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name="TelemetryWriter", daemon=True)
+        self.thread.start()
+        self._log(EVENT_SESSION_START)
+
+    def close(self):
+        """Write the session end marker and wait for everything to hit the disk."""
+        if self.thread is None:
+            return
+        self._log(EVENT_SESSION_END)
+        self._queue.put(None)
+        self.thread.join(timeout=5.0)
+        self.thread = None
+
+    def frame(self, latency_ms, inference_ms, hand_present, program_active, dropped_total=0):
+        """Call once per frame. Emits tracking events and a STATS record per interval."""
+        now = time.time()
+        self._flags = (FLAG_ACTIVE if program_active else 0) | (FLAG_HAND if hand_present else 0)
+
+        if hand_present != self._hand_present:
+            self._hand_present = hand_present
+            if hand_present:
+                lost_for = now - self._lost_at if self._lost_at else 0.0
+                self._log(EVENT_TRACKING_FOUND, value=lost_for, now=now)
+            else:
+                self._lost_at = now
+                self._log(EVENT_TRACKING_LOST, now=now)
+
+        if self._interval_start is None:
+            self._interval_start = now
+            self._last_dropped_total = dropped_total
+        self._frames += 1
+        self._latency_sum += latency_ms
+        self._inference_sum += inference_ms
+
+        elapsed = now - self._interval_start
+        if elapsed >= self.stats_interval:
+            self._log(EVENT_STATS, now=now,
+                      fps=self._frames / elapsed,
+                      latency_ms=self._latency_sum / self._frames,
+                      inference_ms=self._inference_sum / self._frames,
+                      value=dropped_total - self._last_dropped_total)
+            self._interval_start = now
+            self._frames = 0
+            self._latency_sum = 0.0
+            self._inference_sum = 0.0
+            self._last_dropped_total = dropped_total
+            self._check_settings(now)
+
+    def gesture(self, gesture_name, action_name):
+        """Call once per frame; only changes are recorded."""
+        if gesture_name != self._last_gesture:
+            self._last_gesture = gesture_name
+            self._log(EVENT_GESTURE, gesture=self._gesture_index.get(gesture_name, UNKNOWN))
+        if action_name != self._last_action:
+            self._last_action = action_name
+            self._log(EVENT_ACTION, action=self._action_index.get(action_name, UNKNOWN))
+
+    def toggle(self, program_active):
+        """Call when the TOGGLE gesture pauses or resumes the program."""
+        self._flags = (self._flags & ~FLAG_ACTIVE) | (FLAG_ACTIVE if program_active else 0)
+        self._log(EVENT_TOGGLE)
+
+    def _check_settings(self, now):
+        if self.settings is None:
+            return
+        for index, name in enumerate(SETTING_NAMES):
+            value = getattr(self.settings, name, None)
+            if value is None:
+                continue
+            # Rounded so slow ROI auto-calibration does not log every second
+            value = round(value, 2)
+            if self._last_settings.get(name) != value:
+                self._last_settings[name] = value
+                self._log(EVENT_SETTING, gesture=index, value=value, now=now)
+
+    def _log(self, event, gesture=0, action=0, fps=0.0, latency_ms=0.0, inference_ms=0.0,
+             value=0.0, now=None):
+        if self.thread is None:
+            # Telemetry disabled or already closed
+            return
+        record = (now or time.time(), event, gesture, action, self._flags,
+                  fps, latency_ms, inference_ms, value)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.records_dropped += 1
+
+    # --- Writer thread ---
+    def _run(self):
+        done = False
+        while not done:
+            batch = []
+            try:
+                item = self._queue.get(timeout=1.0)
+                while True:
+                    if item is None:
+                        done = True
+                        break
+                    batch.append(item)
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                self._write(np.array(batch, dtype=RECORD_DTYPE).tobytes())
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, data):
+        if self._file is None or self._file_bytes + len(data) > self.max_file_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._file_bytes += len(data)
+
+    def _rotate(self):
+        if self._file:
+            self._file.close()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"telemetry-{stamp}-{os.getpid()}-{self._file_index:03d}.bin")
+        self._file_index += 1
+        self._file = open(path, "ab")
+        header = MAGIC + np.array([RECORD_DTYPE.itemsize, 0], dtype='<u4').tobytes()
+        self._file.write(header)
+        self._file_bytes = len(header)
+
+
+# --- Reader ---
+def local_seconds(times):
+    """
+    Unix times shifted by the local UTC offset, so `// 86400` gives local days.
+    The offset is looked up once per distinct hour, which also follows DST.
+    """
+    hours, inverse = np.unique(np.asarray(times, dtype=np.float64) // 3600, return_inverse=True)
+    offsets = np.array([time.localtime(h * 3600).tm_gmtoff for h in hours], dtype=np.float64)
+    return times + offsets[inverse.reshape(-1)]
+
+def open_log(path):
+    """Memory-map one telemetry file as a structured array (no copy)."""
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or header[:8] != MAGIC:
+        raise ValueError(f"{path} is not a telemetry file")
+    record_size = int(np.frombuffer(header[8:12], dtype='<u4')[0])
+    if record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} has {record_size}-byte records, expected {RECORD_DTYPE.itemsize}")
+    # Ignore a partial record left by a crash mid-write
+    count = (os.path.getsize(path) - HEADER_SIZE) // record_size
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+def open_logs(directory, since=None):
+    """Yields a memory-mapped array per telemetry file, oldest first."""
+    for path in sorted(glob.glob(os.path.join(directory, "telemetry-*.bin"))):
+        try:
+            records = open_log(path)
+        except ValueError as e:
+            print(f"Skipping {e}")
+            continue
+        if since is not None and len(records) and records['time'][-1] < since:
+            continue
+        yield records
+
+def summarize(directory, since=None, false_toggle_window=3.0):
+    """
+    Aggregate every log in `directory`. Each file is filtered while still
+    memory-mapped, so only the selected records are ever copied.
+    """
+    parts = {event: [] for event in (EVENT_STATS, EVENT_GESTURE, EVENT_ACTION, EVENT_TOGGLE,
+                                      EVENT_TRACKING_FOUND, EVENT_SETTING)}
+    for records in open_logs(directory, since):
+        if since is not None:
+            records = records[records['time'] >= since]
+        events = records['event']
+        for event, chunks in parts.items():
+            chunks.append(records[events == event])
+    merged = {event: np.concatenate(chunks) if chunks else np.zeros(0, dtype=RECORD_DTYPE)
+              for event, chunks in parts.items()}
+
+    stats = merged[EVENT_STATS]
+    toggles = np.sort(merged[EVENT_TOGGLE]['time'])
+    found = merged[EVENT_TRACKING_FOUND]
+    hours = len(stats) * 1.0 / 3600  # one STATS record per active second
+
+    gestures = np.bincount(merged[EVENT_GESTURE]['gesture'], minlength=256)
+    actions = np.bincount(merged[EVENT_ACTION]['action'], minlength=256)
+    # A toggle undone within a few seconds was almost certainly unintended
+    false_toggles = int(np.count_nonzero(np.diff(toggles) < false_toggle_window)) if len(toggles) > 1 else 0
+
+    # Latency drift: median / p95 per local day (matches the local times printed elsewhere)
+    daily = []
+    if len(stats):
+        days = (local_seconds(stats['time']) // 86400).astype(np.int64)
+        for day in np.unique(days):
+            latency = stats['latency_ms'][days == day]
+            daily.append((time.strftime("%Y-%m-%d", time.gmtime(day * 86400)),
+                          float(np.median(latency)), float(np.percentile(latency, 95)),
+                          float(np.median(stats['fps'][days == day]))))
+
+    # Effect of each setting change on latency (median over a minute either side).
+    # Stats are sorted once; each window is then two binary searches.
+    setting_effects = []
+    order = np.argsort(stats['time'], kind='stable')
+    times = stats['time'][order]
+    latency = stats['latency_ms'][order]
+    changes = merged[EVENT_SETTING]
+    if len(changes) and len(times):
+        t = changes['time']
+        before_start = np.searchsorted(times, t - 60, side='left')
+        before_end = np.searchsorted(times, t, side='left')
+        after_start = np.searchsorted(times, t, side='right')
+        after_end = np.searchsorted(times, t + 60, side='right')
+        for change, b0, b1, a0, a1 in zip(changes, before_start, before_end, after_start, after_end):
+            if b1 > b0 and a1 > a0:
+                index = change['gesture']
+                name = SETTING_NAMES[index] if index < len(SETTING_NAMES) else "?"
+                setting_effects.append((float(change['time']), name, float(change['value']),
+                                        float(np.median(latency[b0:b1])), float(np.median(latency[a0:a1]))))
+
+    return {
+        'hours': hours,
+        'gestures': {name: int(gestures[i]) for i, name in enumerate(GESTURE_NAMES) if gestures[i]},
+        'actions': {name: int(actions[i]) for i, name in enumerate(ACTION_NAMES) if actions[i]},
+        'toggles': len(toggles),
+        'false_toggles': false_toggles,
+        'tracking_losses': len(found),
+        'mean_loss_seconds': float(found['value'].mean()) if len(found) else 0.0,
+        'dropped_frames': int(stats['value'].sum()) if len(stats) else 0,
+        'daily_latency': daily,
+        'setting_effects': setting_effects,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize accessiGesture telemetry logs")
+    parser.add_argument("directory", nargs="?", default="telemetry")
+    parser.add_argument("--days", type=float, help="Only include the last N days")
+    args = parser.parse_args()
+
+    since = time.time() - args.days * 86400 if args.days else None
+    summary = summarize(args.directory, since)
+    hours = summary['hours']
+    per_hour = (lambda n: n / hours) if hours else (lambda n: 0.0)
+
+    print(f"Tracked time: {hours:.1f} h")
+    print(f"Tracking losses: {summary['tracking_losses']} ({per_hour(summary['tracking_losses']):.1f}/h, "
+          f"mean {summary['mean_loss_seconds']:.1f}s)")
+    print(f"Toggles: {summary['toggles']} ({summary['false_toggles']} undone within 3s)")
+    print(f"Dropped frames: {summary['dropped_frames']}")
+    print("\nGestures:")
+    for name, count in summary['gestures'].items():
+        print(f"  {name:<12} {count:>8} ({per_hour(count):.0f}/h)")
+    print("\nActions:")
+    for name, count in summary['actions'].items():
+        print(f"  {name:<18} {count:>8}")
+    print("\nLatency by day (median / p95 ms, median FPS):")
+    for day, median, p95, fps in summary['daily_latency']:
+        print(f"  {day}  {median:6.1f} / {p95:6.1f}  {fps:5.1f} fps")
+    worst = sorted(summary['setting_effects'], key=lambda e: e[4] - e[3], reverse=True)[:10]
+    if worst:
+        print("\nSetting changes with the largest latency increase:")
+        for t, name, value, before, after in worst:
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(t))
+            print(f"  {stamp}  {name}={value:g}: {before:.1f} -> {after:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())